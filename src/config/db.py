@@ -1,34 +1,157 @@
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_community.vectorstores import Neo4jVector
+from neo4j import AsyncGraphDatabase
+import numpy as np
+import asyncio
+import functools
 import os
+import xxhash
 
-embedding = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
-def create_vectordb(documents, url):
-    
-    # Metadata enrichment with URL
-    for doc in documents:
-        doc.metadata["source_url"] = url
-    
-    # Create vector database with optimized parameters
-    db = Neo4jVector.from_documents(
-        documents=documents,
-        embedding=embedding,
-        username=os.getenv("NEO4J_USER"),
-        password=os.getenv("NEO4J_PASSWORD"),
-        url=os.getenv("NEO4J_URI"),
-        index_name="ecom_index",  # Consistent index name
-        node_label="ECOM"  # Consistent node label
+EMBED_BATCH_SIZE = 96
+EMBED_CONCURRENCY = 16
+INSERT_BATCH_SIZE = 1000
+
+# Output size of models/text-embedding-004
+EMBEDDING_DIMENSIONS = 768
+
+INSERT_CYPHER = """
+UNWIND $rows AS row
+MERGE (n:ECOM {id: row.id})
+SET n += row.metadata,
+    n.text = row.text,
+    n.embedding = row.embedding
+"""
+
+ID_CONSTRAINT_CYPHER = """
+CREATE CONSTRAINT ecom_id IF NOT EXISTS
+FOR (n:ECOM) REQUIRE n.id IS UNIQUE
+"""
+
+VECTOR_INDEX_CYPHER = """
+CREATE VECTOR INDEX ecom_index IF NOT EXISTS
+FOR (n:ECOM) ON (n.embedding)
+OPTIONS {indexConfig: {
+    `vector.dimensions`: $dimensions,
+    `vector.similarity_function`: 'cosine'
+}}
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedding():
+    """Embedding client, built on first use so GOOGLE_API_KEY is loaded by then."""
+    return GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+
+
+@functools.lru_cache(maxsize=1)
+def get_driver():
+    """Shared async Neo4j driver, created on first use once the environment is loaded."""
+    return AsyncGraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")),
+        max_connection_pool_size=50
     )
-    
-    return db
 
 
+async def ensure_vector_index():
+    """Create the id constraint MERGE relies on and the vector index load_vectordb reads."""
+    async with get_driver().session() as session:
+        await session.run(ID_CONSTRAINT_CYPHER)
+        await session.run(VECTOR_INDEX_CYPHER, dimensions=EMBEDDING_DIMENSIONS)
+
+
+async def _write_rows(tx, ids, texts, embeddings, metadata_columns):
+    for start in range(0, len(texts), INSERT_BATCH_SIZE):
+        stop = start + INSERT_BATCH_SIZE
+        rows = [
+            {
+                "id": node_id,
+                "text": text,
+                "embedding": vector,
+                "metadata": {key: column[i] for key, column in metadata_columns.items() if column[i] is not None}
+            }
+            for i, (node_id, text, vector) in enumerate(
+                zip(ids[start:stop], texts[start:stop], embeddings[start:stop].tolist()), start
+            )
+        ]
+        result = await tx.run(INSERT_CYPHER, rows=rows)
+        await result.consume()
+
+
+async def _embed_batches(text_batches):
+    """Embed every batch concurrently, capped at EMBED_CONCURRENCY in-flight calls."""
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed(batch):
+        async with semaphore:
+            return await get_embedding().aembed_documents(batch)
+
+    return await asyncio.gather(*(embed(batch) for batch in text_batches))
+
+
+def dedupe_texts(texts):
+    """Indices of the first occurrence of each normalized text (drops repeated headers, footers, nav)."""
+    seen = set()
+    keep = []
+    for i, text in enumerate(texts):
+        digest = xxhash.xxh3_64(text.strip().lower().encode()).intdigest()
+        if digest not in seen:
+            seen.add(digest)
+            keep.append(i)
+    return keep
+
+
+def to_columns(metadatas):
+    """Turn a list of metadata dicts into a dict of equally long lists (None where a key is missing)."""
+    columns = {}
+    for i, metadata in enumerate(metadatas):
+        for key, value in metadata.items():
+            columns.setdefault(key, [None] * len(metadatas))[i] = value
+    return columns
+
+
+async def create_vectordb(texts, metadatas, url):
+    """
+    Embed chunks and store them as ECOM nodes tagged with `url`.
+
+    Args:
+        texts (list): Chunk texts.
+        metadatas (list): Metadata dict for each text, in the same order.
+        url (str): Knowledge base id stored as source_url.
+
+    Returns:
+        int: Number of nodes written.
+    """
+    # Deduplicate, then order longest first so every batch holds similarly sized texts
+    order = sorted(dedupe_texts(texts), key=lambda i: len(texts[i]), reverse=True)
+    if not order:
+        return 0
+    texts = [texts[i] for i in order]
+    metadata_columns = to_columns([metadatas[i] for i in order])
+
+    # Metadata enrichment with URL
+    metadata_columns["source_url"] = [url] * len(texts)
+
+    text_batches = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    vectors = [vector for batch in await _embed_batches(text_batches) for vector in batch]
+    embeddings = np.asarray(vectors, dtype=np.float32)
+    # Deterministic ids, so re-ingesting a knowledge base (and retrying the transaction) updates nodes in place
+    ids = [xxhash.xxh3_128(f"{url}\0{text}".encode()).hexdigest() for text in texts]
+
+    # One transaction, one UNWIND per INSERT_BATCH_SIZE rows
+    async with get_driver().session() as session:
+        await session.execute_write(_write_rows, ids, texts, embeddings, metadata_columns)
+
+    return len(texts)
+
+
+@functools.lru_cache(maxsize=1)
 def load_vectordb():
     return Neo4jVector.from_existing_index(
-        embedding=embedding,
+        embedding=get_embedding(),
         username=os.getenv("NEO4J_USER"),
         password=os.getenv("NEO4J_PASSWORD"),
         url=os.getenv("NEO4J_URI"),
         index_name="ecom_index",
         node_label="ECOM"
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,41 @@
+# Chunks shorter than this carry too little context to embed on their own
+MIN_CHUNK_SIZE = 100
+
+# How far past chunk_size a merged chunk may grow, and the size that forces a re-split
+MERGE_RATIO = 1.1
+RESPLIT_RATIO = 1.15
+
+def normalize_chunks(chunks, text_splitter, chunk_size, min_chunk_size=MIN_CHUNK_SIZE):
+    """
+    Merge tiny chunks into their neighbours and re-split oversized ones.
+
+    Args:
+        chunks (list): Chunks produced by text_splitter.
+        text_splitter: Splitter used to break up oversized chunks.
+        chunk_size (int): The splitter's target chunk size.
+        min_chunk_size (int): Chunks shorter than this are merged.
+
+    Returns:
+        list: Normalized chunks.
+    """
+    merge_limit = int(chunk_size * MERGE_RATIO)
+    resplit_limit = int(chunk_size * RESPLIT_RATIO)
+
+    merged = []
+    for chunk in chunks:
+        if (
+            merged
+            and (len(chunk) < min_chunk_size or len(merged[-1]) < min_chunk_size)
+            and len(merged[-1]) + 1 + len(chunk) <= merge_limit
+        ):
+            merged[-1] = f"{merged[-1]}\n{chunk}"
+        else:
+            merged.append(chunk)
+
+    normalized = []
+    for chunk in merged:
+        if len(chunk) > resplit_limit:
+            normalized.extend(text_splitter.split_text(chunk))
+        else:
+            normalized.append(chunk)
+    return normalized
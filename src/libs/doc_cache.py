@@ -0,0 +1,120 @@
+import functools
+import inspect
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from libs.text_splitter import SPLITTER_NAME
+from utils.fast_digest import fast_digest
+from utils.serialize_docs import serialize_docs, deserialize_docs
+
+logging.basicConfig(level=logging.INFO)
+
+# Every loader caches under this root; the oldest entries are evicted past the limit
+CACHE_ROOT = Path('.cache')
+CACHE_BYTES_LIMIT = 2 * 1024 ** 3
+
+# Arguments that do not change a loader's output
+UNKEYED_ARGUMENTS = ("cache_dir", "refresh", "content")
+
+def create_cache_key(func, arguments):
+    # The splitter is keyed too, so environments with and without the Rust one never share entries
+    keyed = sorted((name, value) for name, value in arguments.items() if name not in UNKEYED_ARGUMENTS)
+    return fast_digest(repr((func.__qualname__, SPLITTER_NAME, keyed)).encode())
+
+def read_cache(cache_path):
+    """
+    Load cached Documents, or return None on a miss or unreadable entry.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            documents = deserialize_docs(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Cache load failed: {e}. Reloading.")
+        return None
+
+    # Bump the mtime so eviction treats this entry as recently used; the entry may
+    # already be evicted or the directory read-only, neither of which matters here
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return documents
+
+def write_cache(cache_path, documents):
+    """
+    Atomically write Documents to the cache, then evict old entries if needed.
+    """
+    tmp_path = None
+    try:
+        payload = serialize_docs(documents)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+        logging.info("Cached processed documents successfully.")
+    except Exception as e:
+        logging.error(f"Failed to cache data: {e}")
+        # evict_cache only counts *.zst, so a leftover temp file would never be reclaimed
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        return
+
+    evict_cache()
+
+def evict_cache(root=CACHE_ROOT, bytes_limit=CACHE_BYTES_LIMIT):
+    """
+    Delete least recently used cache entries until the cache fits in bytes_limit.
+    """
+    entries = []
+    for path in root.rglob("*.zst"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= bytes_limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+def cache_documents(func):
+    """
+    Cache a loader's Document list on disk.
+
+    The key is derived from the loader's arguments. The wrapped loader must
+    accept `cache_dir` (where entries are stored) and `refresh` (skip the
+    cached entry and rebuild it). A `content` argument, if present, is treated
+    as a prefetched copy of the source and is not part of the key.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+
+        cache_path = Path(arguments["cache_dir"]) / f"{create_cache_key(func, arguments)}.zst"
+        if not arguments["refresh"]:
+            documents = read_cache(cache_path)
+            if documents is not None:
+                logging.info(f"Loaded {func.__name__} result from cache.")
+                return documents
+
+        documents = func(*args, **kwargs)
+        if documents:
+            write_cache(cache_path, documents)
+        return documents
+
+    return wrapper
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from functools import partial
+
+import aiohttp
+
+logging.basicConfig(level=logging.INFO)
+
+# Per-request limits for source downloads; aiohttp's default is a 5 minute total
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=60, sock_connect=10, sock_read=30)
+
+def is_url(path):
+    return path.startswith("http://") or path.startswith("https://")
+
+async def fetch_bytes(session, url):
+    """
+    Download a URL with a shared aiohttp session.
+
+    Args:
+        session (aiohttp.ClientSession): Session reused across all downloads.
+        url (str): The URL to fetch.
+
+    Returns:
+        bytes: Response body, or None if the request failed or timed out.
+    """
+    try:
+        async with session.get(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status == 200:
+                return await response.read()
+            logging.error(f"Failed to fetch {url}, status code: {response.status}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"Failed to fetch {url}: {e!r}")
+    return None
+
+async def run_loader(loader, file_path, session, executor=None, **kwargs):
+    """
+    Download `file_path` with a shared aiohttp session (when it is a URL), then
+    run `loader` on `executor` with the bytes passed as `content`.
+
+    Args:
+        loader (callable): A load_and_process_* function that accepts `content`.
+        file_path (str): Local path or URL.
+        session (aiohttp.ClientSession): Session reused across all downloads.
+        executor (Executor, optional): Where the loader runs.
+
+    Returns:
+        list: LangChain Document objects.
+    """
+    content = None
+    if is_url(file_path):
+        content = await fetch_bytes(session, file_path)
+        if content is None:
+            return []
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(loader, file_path, content=content, **kwargs))
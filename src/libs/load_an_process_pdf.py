@@ -1,43 +1,60 @@
-import hashlib
 import logging
-import pickle
 import requests
-import io
 from pathlib import Path
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 import fitz  # PyMuPDF
 
+from libs.http import is_url
+from libs.chunk_normalize import normalize_chunks
+from libs.doc_cache import cache_documents
+from libs.text_splitter import create_text_splitter, split_stream
+
 logging.basicConfig(level=logging.INFO)
 
-def create_cache_key(path):
-    return hashlib.md5(path.encode()).hexdigest()
+def iter_page_texts(doc):
+    # Serial on purpose: MuPDF's context is not thread-safe, and sources are
+    # already spread across processes by the ingest pool
+    for page in doc:
+        yield page.get_text("text", sort=True)
+
+def read_pdf_from_stream(content):
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        yield from iter_page_texts(doc)
 
 def read_pdf_from_local(file_path):
     with fitz.open(file_path) as doc:
-        return "\n".join(page.get_text() for page in doc)
+        yield from iter_page_texts(doc)
 
 def read_pdf_from_url(url):
     response = requests.get(url)
     if response.status_code == 200:
-        with fitz.open(stream=io.BytesIO(response.content), filetype="pdf") as doc:
-            return "\n".join(page.get_text() for page in doc)
+        yield from read_pdf_from_stream(response.content)
     else:
         logging.error(f"Failed to fetch PDF from {url}, status code: {response.status_code}")
-        return ""
 
-def read_pdf(file_path):
-    if file_path.startswith("http://") or file_path.startswith("https://"):
+def read_pdf(file_path, content=None):
+    """
+    Yield the text of each page of a PDF, one page at a time.
+
+    Args:
+        file_path (str): Local path or URL to PDF.
+        content (bytes, optional): Already-downloaded PDF bytes.
+    """
+    if content is not None:
+        return read_pdf_from_stream(content)
+    if is_url(file_path):
         return read_pdf_from_url(file_path)
     else:
         return read_pdf_from_local(file_path)
 
+@cache_documents
 def load_and_process_pdf(
     file_path,
     chunk_size=1000,
     chunk_overlap=200,
     cache_dir=Path('.cache/pdf'),
-    refresh=False
+    refresh=False,
+    content=None
 ):
     """
     Load and process a PDF file from local path or URL, with caching and chunking.
@@ -48,38 +65,21 @@ def load_and_process_pdf(
         chunk_overlap (int): Overlap between chunks.
         cache_dir (Path): Directory to store cached files.
         refresh (bool): Force refresh of cache.
+        content (bytes, optional): Already-downloaded PDF bytes.
 
     Returns:
         list: LangChain Document objects.
     """
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_key = create_cache_key(file_path)
-    cache_path = cache_dir / f"{cache_key}.pkl"
-
-    if not refresh and cache_path.exists():
-        try:
-            with open(cache_path, 'rb') as f:
-                logging.info("Loaded PDF from cache.")
-                return pickle.load(f)
-        except Exception as e:
-            logging.warning(f"Cache load failed: {e}. Reloading.")
-
     try:
         logging.info(f"Reading PDF: {file_path}")
-        full_text = read_pdf(file_path)
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        chunks = text_splitter.split_text(full_text)
+        # Split pages as they arrive instead of materializing the whole text
+        chunks = split_stream(text_splitter, read_pdf(file_path, content), chunk_size)
+        chunks = normalize_chunks(chunks, text_splitter, chunk_size)
 
         documents = [Document(page_content=chunk, metadata={"source_file": file_path}) for chunk in chunks]
 
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(documents, f)
-                logging.info("Cached processed PDF successfully.")
-        except Exception as e:
-            logging.error(f"Failed to cache PDF: {e}")
-
         return documents
 
     except Exception as e:
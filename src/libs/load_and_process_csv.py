@@ -1,39 +1,44 @@
 import csv
-import hashlib
+import io
 import logging
-import pickle
 import requests
-import io
 from pathlib import Path
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pac
 from langchain.schema import Document
 
-logging.basicConfig(level=logging.INFO)
+from libs.http import is_url
+from libs.chunk_normalize import normalize_chunks
+from libs.doc_cache import cache_documents
+from libs.text_splitter import create_text_splitter
 
-def create_cache_key(path, delimiter):
-    key = f"{path}_{delimiter}"
-    return hashlib.md5(key.encode()).hexdigest()
+logging.basicConfig(level=logging.INFO)
 
-def read_csv_file(file_path, delimiter=','):
+def read_csv_file(file_path, delimiter=',', content=None):
     """
-    Reads a CSV file from a local path or URL and returns a list of dictionaries (rows).
+    Reads a CSV file from a local path or URL and returns a list of row strings.
 
     Args:
         file_path (str): Path to the CSV file or URL.
         delimiter (str): Delimiter used in the CSV file.
+        content (bytes, optional): Already-downloaded CSV bytes.
 
     Returns:
         list: List of row strings.
     """
+    if content is not None:
+        return read_csv_from_bytes(content, delimiter)
+
     # Check if file_path is a URL or a local path
-    if file_path.startswith('http://') or file_path.startswith('https://'):
+    if is_url(file_path):
         return read_csv_from_url(file_path, delimiter)
     else:
         return read_csv_from_local(file_path, delimiter)
 
 def read_csv_from_url(url, delimiter=','):
     """
-    Reads a CSV file from a URL and returns a list of dictionaries (rows).
+    Reads a CSV file from a URL and returns a list of row strings.
 
     Args:
         url (str): URL to the CSV file.
@@ -44,20 +49,31 @@ def read_csv_from_url(url, delimiter=','):
     """
     response = requests.get(url)
     if response.status_code == 200:
-        csvfile = io.StringIO(response.text)
-        reader = csv.DictReader(csvfile, delimiter=delimiter)
-        rows = []
-        for row in reader:
-            row_str = ', '.join(f"{k}: {v}" for k, v in row.items())
-            rows.append(row_str)
-        return rows
+        return read_csv_from_bytes(response.content, delimiter)
     else:
         logging.error(f"Failed to fetch CSV from {url}, status code: {response.status_code}")
         return []
 
+def read_csv_from_bytes(content, delimiter=','):
+    """
+    Parses CSV bytes that are already in memory and returns a list of row strings.
+
+    Args:
+        content (bytes): CSV content.
+        delimiter (str): Delimiter used in the CSV file.
+
+    Returns:
+        list: List of row strings.
+    """
+    return read_csv_rows(
+        lambda: pa.BufferReader(content),
+        lambda: io.StringIO(content.decode('utf-8'), newline=''),
+        delimiter
+    )
+
 def read_csv_from_local(file_path, delimiter=','):
     """
-    Reads a CSV file from a local path and returns a list of dictionaries (rows).
+    Reads a CSV file from a local path and returns a list of row strings.
 
     Args:
         file_path (str): Path to the local CSV file.
@@ -66,21 +82,87 @@ def read_csv_from_local(file_path, delimiter=','):
     Returns:
         list: List of row strings.
     """
-    rows = []
-    with open(file_path, newline='', encoding='utf-8') as csvfile:
+    return read_csv_rows(
+        lambda: str(file_path),
+        lambda: open(file_path, newline='', encoding='utf-8'),
+        delimiter
+    )
+
+def read_csv_rows(open_source, open_text, delimiter=','):
+    """
+    Read row strings with pyarrow, falling back to csv.DictReader for files
+    pyarrow cannot render the same way: rows with a different number of fields
+    than the header (ArrowInvalid) and duplicate column names (DictReader keeps
+    the last value).
+
+    Args:
+        open_source (callable): Returns a fresh path or buffer for pyarrow.
+        open_text (callable): Returns a text file object for the csv module.
+        delimiter (str): Delimiter used in the CSV file.
+
+    Returns:
+        list: List of row strings.
+    """
+    try:
+        table = read_csv_table(open_source, delimiter)
+        if len(set(table.column_names)) == table.num_columns:
+            return format_rows(table)
+        logging.info("CSV has duplicate column names, reading it with the csv module")
+    except pa.ArrowInvalid as e:
+        logging.info(f"CSV is irregular ({e}), reading it with the csv module")
+
+    with open_text() as csvfile:
         reader = csv.DictReader(csvfile, delimiter=delimiter)
-        for row in reader:
-            row_str = ', '.join(f"{k}: {v}" for k, v in row.items())
-            rows.append(row_str)
-    return rows
+        return [', '.join(f"{k}: {v}" for k, v in row.items()) for row in reader]
 
+def read_csv_table(open_source, delimiter=','):
+    """
+    Parse a CSV into an Arrow table with pyarrow's multi-threaded reader.
+
+    Every column is read as text so values keep their original formatting.
+
+    Args:
+        open_source (callable): Returns a fresh path or buffer each call.
+        delimiter (str): Delimiter used in the CSV file.
+
+    Returns:
+        pyarrow.Table: Table with one string column per CSV column.
+    """
+    parse_options = pac.ParseOptions(delimiter=delimiter, newlines_in_values=True)
+    reader = pac.open_csv(open_source(), parse_options=parse_options)
+    column_names = reader.schema.names
+    reader.close()
+
+    convert_options = pac.ConvertOptions(column_types={name: pa.string() for name in column_names})
+    return pac.read_csv(open_source(), parse_options=parse_options, convert_options=convert_options)
+
+def format_rows(table):
+    """
+    Render each row as "column: value, column: value" with Arrow compute kernels.
+
+    Args:
+        table (pyarrow.Table): Table of string columns.
+
+    Returns:
+        list: List of row strings.
+    """
+    if table.num_columns == 0:
+        return []
+    fields = [
+        pc.binary_join_element_wise(f"{name}: ", column, "")
+        for name, column in zip(table.column_names, table.columns)
+    ]
+    return pc.binary_join_element_wise(*fields, ", ").to_pylist()
+
+@cache_documents
 def load_and_process_csv(
     file_path, 
     delimiter=',', 
     chunk_size=1000, 
     chunk_overlap=200, 
     cache_dir=Path('.cache/csv'),
-    refresh=False
+    refresh=False,
+    content=None
 ):
     """
     Load and process a CSV file with optional caching and text chunking.
@@ -92,45 +174,24 @@ def load_and_process_csv(
         chunk_overlap (int): Overlap between chunks.
         cache_dir (Path): Directory to store cached files.
         refresh (bool): Force refresh of cache.
+        content (bytes, optional): Already-downloaded CSV bytes.
 
     Returns:
         list: LangChain Document objects.
     """
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create cache key from the path and delimiter
-    cache_key = create_cache_key(str(file_path), delimiter)
-    cache_path = cache_dir / f"{cache_key}.pkl"
-
-    # Check for cached documents
-    if not refresh and cache_path.exists():
-        try:
-            with open(cache_path, 'rb') as f:
-                logging.info("Loaded CSV from cache.")
-                return pickle.load(f)
-        except Exception as e:
-            logging.warning(f"Cache load failed: {e}. Reloading.")
-
     try:
         logging.info(f"Reading CSV file: {file_path}")
-        row_texts = read_csv_file(file_path, delimiter)
+        row_texts = read_csv_file(file_path, delimiter, content)
         full_text = "\n".join(row_texts)
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
         chunks = text_splitter.split_text(full_text)
+        chunks = normalize_chunks(chunks, text_splitter, chunk_size)
 
         documents = [Document(page_content=chunk, metadata={"source_file": str(file_path)}) for chunk in chunks]
 
-        # Cache the processed documents
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(documents, f)
-                logging.info("Cached processed CSV successfully.")
-        except Exception as e:
-            logging.error(f"Failed to cache CSV: {e}")
-
         return documents
 
     except Exception as e:
         logging.error(f"Error processing CSV: {e}")
-        return []
\ No newline at end of file
+        return []
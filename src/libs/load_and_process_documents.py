@@ -1,25 +1,34 @@
-import functools
-import hashlib
 import logging
-import pickle
+import os
+import threading
 import time
+from multiprocessing.util import Finalize
 from pathlib import Path
 
-import bs4
+import httpx
+from selectolax.parser import HTMLParser
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+from libs.chunk_normalize import normalize_chunks
+from libs.doc_cache import cache_documents
+from libs.text_splitter import create_text_splitter
+
 logging.basicConfig(level=logging.INFO)
 
-def create_cache_key(url):
-    """Generate a unique cache key from the URL."""
-    return hashlib.md5(url.encode()).hexdigest()
+# Pages whose static HTML yields less text than this are re-fetched with Selenium
+MIN_STATIC_TEXT_LENGTH = 500
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+TEXT_TAGS = HEADING_TAGS | {"p", "li", "a"}
 
 def extract_text_with_links(html_content):
     """
@@ -31,21 +40,134 @@ def extract_text_with_links(html_content):
     Returns:
         str: Extracted text with links preserved.
     """
-    soup = bs4.BeautifulSoup(html_content, "html.parser")
+    tree = HTMLParser(html_content)
     extracted_text = []
 
-    for element in soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "a", 'div', 'article']):
-        if element.name.startswith("h"):  # Headings
-            extracted_text.append(f"\n{element.get_text(strip=True)}\n" + "=" * len(element.get_text(strip=True)))
-        elif element.name == "p":  # Paragraphs
-            extracted_text.append(element.get_text(strip=True))
-        elif element.name == "li":  # List items
-            extracted_text.append(f"- {element.get_text(strip=True)}")
-        elif element.name == "a" and element.get("href"):  # Links
-            extracted_text.append(f"[{element.get_text(strip=True)}]({element['href']})")  # Markdown-style link
+    for element in tree.root.traverse():
+        tag = element.tag
+        if tag not in TEXT_TAGS:
+            continue
+        if tag in HEADING_TAGS:  # Headings
+            text = element.text(strip=True)
+            extracted_text.append(f"\n{text}\n" + "=" * len(text))
+        elif tag == "p":  # Paragraphs
+            extracted_text.append(element.text(strip=True))
+        elif tag == "li":  # List items
+            extracted_text.append(f"- {element.text(strip=True)}")
+        elif element.attributes.get("href"):  # Links
+            extracted_text.append(f"[{element.text(strip=True)}]({element.attributes['href']})")  # Markdown-style link
 
     return "\n\n".join(extracted_text)
 
+def fetch_static(url):
+    """
+    Fetch server-rendered HTML with a plain HTTP request.
+
+    Args:
+        url (str): The URL to fetch.
+
+    Returns:
+        str: Raw HTML content.
+    """
+    response = httpx.get(url, follow_redirects=True, timeout=10)
+    response.raise_for_status()
+    return response.text
+
+def needs_javascript(html_content, structured_text):
+    """
+    Guess whether a page only renders its content client-side.
+
+    Args:
+        html_content (str): Raw HTML from fetch_static.
+        structured_text (str): Text extracted from that HTML.
+
+    Returns:
+        bool: True when the page should be re-fetched with Selenium.
+    """
+    if "<noscript" in html_content and html_content.count("<p") < 3:
+        return True
+    return len(structured_text) < MIN_STATIC_TEXT_LENGTH
+
+# Seconds without a Selenium fetch before the process quits its Chrome
+DRIVER_IDLE_TIMEOUT = 300
+
+# One headless Chrome per process, launched on first use and reused for every URL
+_driver = None
+_idle_timer = None
+_finalizer_pid = None
+_driver_lock = threading.Lock()
+_fetch_lock = threading.Lock()
+
+def _get_driver():
+    global _driver, _finalizer_pid
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                options = Options()
+                options.add_argument("--headless")  # Run in headless mode (no UI)
+                options.add_argument("--disable-gpu")
+                options.add_argument("--no-sandbox")
+                options.add_argument("--disable-dev-shm-usage")
+
+                service = Service(ChromeDriverManager().install())
+                _driver = webdriver.Chrome(service=service, options=options)
+
+                # Pool workers leave through os._exit, which skips atexit but runs
+                # multiprocessing finalizers. Registered on launch so only processes
+                # that own a Chrome get one, once per process.
+                if _finalizer_pid != os.getpid():
+                    Finalize(None, _cleanup, exitpriority=10)
+                    _finalizer_pid = os.getpid()
+    return _driver
+
+def _cleanup():
+    global _driver
+    with _driver_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+        if _driver is not None:
+            try:
+                _driver.quit()
+            finally:
+                _driver = None
+
+def _quit_if_idle():
+    # A fetch in progress reschedules the timer when it finishes
+    if _fetch_lock.acquire(blocking=False):
+        try:
+            _cleanup()
+        finally:
+            _fetch_lock.release()
+
+def _schedule_idle_quit():
+    global _idle_timer
+    with _driver_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+        _idle_timer = threading.Timer(DRIVER_IDLE_TIMEOUT, _quit_if_idle)
+        _idle_timer.daemon = True
+        _idle_timer.start()
+
+def wait_for_stable_dom(driver, timeout=10, interval=0.5):
+    """
+    Wait for <body> to appear, then until the page source stops growing.
+
+    Args:
+        driver: Selenium WebDriver with the page loaded.
+        timeout (float): Upper bound in seconds for each wait.
+        interval (float): Seconds between DOM size checks.
+    """
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+
+    deadline = time.monotonic() + timeout
+    last_length = -1
+    while time.monotonic() < deadline:
+        length = len(driver.page_source)
+        if length == last_length:
+            return
+        last_length = length
+        time.sleep(interval)
+
 def fetch_dynamic_page_content(url):
     """
     Uses Selenium to load JavaScript-rendered pages and return HTML content.
@@ -56,28 +178,24 @@ def fetch_dynamic_page_content(url):
     Returns:
         str: Fully rendered HTML content.
     """
-    options = Options()
-    options.add_argument("--headless")  # Run in headless mode (no UI)
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    # Setup WebDriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
-    try:
-        logging.info(f"Fetching page with Selenium: {url}")
-        driver.get(url)
-        time.sleep(5)  # Allow time for JavaScript to execute
+    # A WebDriver session handles one page at a time
+    with _fetch_lock:
+        driver = _get_driver()
+        try:
+            logging.info(f"Fetching page with Selenium: {url}")
+            driver.get(url)
+            wait_for_stable_dom(driver)
 
-        # Extract full page HTML
-        html_content = driver.page_source
-        return html_content
-    finally:
-        driver.quit()
+            # Extract full page HTML
+            return driver.page_source
+        except WebDriverException:
+            # Relaunch Chrome on the next call rather than reusing a broken session
+            _cleanup()
+            raise
+        finally:
+            _schedule_idle_quit()
 
-@functools.lru_cache(maxsize=32)
+@cache_documents
 def load_and_process_documents(
     url, 
     chunk_size=1000, 
@@ -98,39 +216,32 @@ def load_and_process_documents(
     Returns:
         list: Processed document chunks (structured text with links).
     """
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    
-    cache_key = create_cache_key(url)
-    cache_path = cache_dir / f"{cache_key}.pkl"
-    
-    # Check cache
-    if not refresh and cache_path.exists():
-        try:
-            with open(cache_path, 'rb') as f:
-                cached_data = pickle.load(f)
-                logging.info("Loaded from cache.")
-                return cached_data
-        except (pickle.PickleError, EOFError) as e:
-            logging.warning(f"Cache load failed: {e}. Reloading.")
-
     try:
         logging.info(f"Fetching data from: {url}")
         
-        # Use Selenium to fetch JavaScript-rendered content
-        html_content = fetch_dynamic_page_content(url)
+        # Try a plain HTTP fetch first; only fall back to Selenium for JavaScript-rendered pages
+        try:
+            html_content = fetch_static(url)
+            structured_text = extract_text_with_links(html_content)
+            use_selenium = needs_javascript(html_content, structured_text)
+        except httpx.HTTPError as e:
+            logging.warning(f"Static fetch failed for {url}: {e}. Falling back to Selenium.")
+            use_selenium = True
 
-        if not html_content:
-            logging.error("Failed to load page content.")
-            return []
+        if use_selenium:
+            html_content = fetch_dynamic_page_content(url)
 
-        logging.info("Extracting structured content with links...")
-        
-        # Extract structured content
-        structured_text = extract_text_with_links(html_content)
+            if not html_content:
+                logging.error("Failed to load page content.")
+                return []
+
+            logging.info("Extracting structured content with links...")
+            structured_text = extract_text_with_links(html_content)
 
         # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
         processed_documents = text_splitter.split_text(structured_text)
+        processed_documents = normalize_chunks(processed_documents, text_splitter, chunk_size)
 
         if not processed_documents:
             logging.error("Document splitting returned an empty list.")
@@ -141,14 +252,6 @@ def load_and_process_documents(
         # Convert text chunks into Document objects with metadata
         doc_objects = [Document(page_content=chunk, metadata={"source_url": url}) for chunk in processed_documents]
 
-        # Cache the documents
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(doc_objects, f)
-            logging.info("Cached processed documents successfully.")
-        except Exception as cache_error:
-            logging.error(f"Failed to cache data: {cache_error}")
-
         return doc_objects  # Return Document objects instead of raw strings
 
     except Exception as e:
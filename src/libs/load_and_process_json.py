@@ -1,41 +1,71 @@
 import json
-import hashlib
+import orjson
 import logging
-import pickle
+import re
 import requests
 from pathlib import Path
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+from libs.http import is_url
+from libs.chunk_normalize import normalize_chunks
+from libs.doc_cache import cache_documents
+from libs.text_splitter import create_text_splitter
+
 logging.basicConfig(level=logging.INFO)
 
-def create_cache_key(path):
-    return hashlib.md5(path.encode()).hexdigest()
+# 19+ digit runs may not fit in 64 bits, which orjson silently turns into floats
+WIDE_INT_PATTERN = re.compile(rb'(?<![\d.])\d{19,}')
+
+def parse_json(content):
+    """
+    Parse JSON bytes with orjson, falling back to the json module for input
+    only it reads faithfully: NaN/Infinity literals and integers wider than
+    64 bits.
+    """
+    if WIDE_INT_PATTERN.search(content) is None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
 
 def flatten_json(obj, parent_key='', sep='.'):
+    """
+    Flatten nested dicts into dotted keys, keeping the original key order.
+
+    Walks the tree with an explicit stack of item iterators instead of
+    recursing and merging a new dict per level.
+    """
     items = {}
-    for k, v in obj.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.update(flatten_json(v, new_key, sep=sep))
-        else:
+    stack = [(iter(obj.items()), parent_key)]
+    while stack:
+        entries, prefix = stack[-1]
+        for k, v in entries:
+            new_key = prefix + sep + k if prefix else k
+            if isinstance(v, dict):
+                stack.append((iter(v.items()), new_key))
+                break
             items[new_key] = v
+        else:
+            stack.pop()
     return items
 
 def read_json_from_local(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return parse_json(f.read())
 
 def read_json_from_url(url):
     response = requests.get(url)
     if response.status_code == 200:
-        return response.json()
+        return parse_json(response.content)
     else:
         logging.error(f"Failed to fetch JSON from {url}, status code: {response.status_code}")
         return []
 
-def read_json(file_path):
-    if file_path.startswith("http://") or file_path.startswith("https://"):
+def read_json(file_path, content=None):
+    if content is not None:
+        data = parse_json(content)
+    elif is_url(file_path):
         data = read_json_from_url(file_path)
     else:
         data = read_json_from_local(file_path)
@@ -45,47 +75,35 @@ def read_json(file_path):
 
     flat_rows = []
     for entry in data:
+        # Arrays of scalars have nothing to flatten
+        if not isinstance(entry, dict):
+            flat_rows.append(str(entry))
+            continue
         flat = flatten_json(entry)
         row_str = ', '.join(f"{k}: {v}" for k, v in flat.items())
         flat_rows.append(row_str)
 
     return "\n".join(flat_rows)
 
+@cache_documents
 def load_and_process_json(
     file_path,
     chunk_size=1000,
     chunk_overlap=200,
     cache_dir=Path(".cache/json"),
-    refresh=False
+    refresh=False,
+    content=None
 ):
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_key = create_cache_key(file_path)
-    cache_path = cache_dir / f"{cache_key}.pkl"
-
-    if not refresh and cache_path.exists():
-        try:
-            with open(cache_path, 'rb') as f:
-                logging.info("Loaded JSON from cache.")
-                return pickle.load(f)
-        except Exception as e:
-            logging.warning(f"Cache load failed: {e}. Reloading.")
-
     try:
         logging.info(f"Reading JSON file: {file_path}")
-        full_text = read_json(file_path)
+        full_text = read_json(file_path, content)
 
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
         chunks = text_splitter.split_text(full_text)
+        chunks = normalize_chunks(chunks, text_splitter, chunk_size)
 
         documents = [Document(page_content=chunk, metadata={"source_file": file_path}) for chunk in chunks]
 
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(documents, f)
-                logging.info("Cached processed JSON successfully.")
-        except Exception as e:
-            logging.error(f"Failed to cache JSON: {e}")
-
         return documents
 
     except Exception as e:
@@ -1,29 +1,47 @@
-import hashlib
+import codecs
+import io
 import logging
-import pickle
+import mmap
+import os
 from pathlib import Path
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
-logging.basicConfig(level=logging.INFO)
+from libs.chunk_normalize import normalize_chunks
+from libs.doc_cache import cache_documents
+from libs.text_splitter import create_text_splitter, split_stream
 
-def create_cache_key(path):
-    return hashlib.md5(path.encode()).hexdigest()
+logging.basicConfig(level=logging.INFO)
 
-def read_txt_file(file_path):
+def read_txt_file(file_path, block_size=1 << 20):
     """
-    Reads the content of a plain text file.
+    Reads a plain text file through a memory map, decoding it block by block.
+
+    Newlines are translated like open(..., 'r') does, so CRLF and CR files
+    split on the same "\n" separators as LF files.
 
     Args:
         file_path (str): Path to the text file.
+        block_size (int): Bytes decoded per block.
 
-    Returns:
-        str: Entire text content.
+    Yields:
+        str: Consecutive pieces of the text content.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
-
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Same decoder stack as TextIOWrapper; a trailing '\r' is held until the next block
+            decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+            for block in iter(lambda: mm.read(block_size), b''):
+                text = decoder.decode(block)
+                if text:
+                    yield text
+            text = decoder.decode(b'', final=True)
+            if text:
+                yield text
+
+@cache_documents
 def load_and_process_txt(
     file_path,
     chunk_size=1000,
@@ -45,35 +63,15 @@ def load_and_process_txt(
         list: LangChain Document objects.
     """
     file_path = Path(file_path)
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
-    cache_key = create_cache_key(str(file_path))
-    cache_path = cache_dir / f"{cache_key}.pkl"
-
-    if not refresh and cache_path.exists():
-        try:
-            with open(cache_path, 'rb') as f:
-                logging.info("Loaded text from cache.")
-                return pickle.load(f)
-        except Exception as e:
-            logging.warning(f"Cache load failed: {e}. Reloading.")
 
     try:
         logging.info(f"Reading text file: {file_path}")
-        text = read_txt_file(file_path)
-
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        chunks = text_splitter.split_text(text)
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
+        chunks = split_stream(text_splitter, read_txt_file(file_path), chunk_size, separator="")
+        chunks = normalize_chunks(chunks, text_splitter, chunk_size)
 
         documents = [Document(page_content=chunk, metadata={"source_file": str(file_path)}) for chunk in chunks]
 
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(documents, f)
-                logging.info("Cached processed text successfully.")
-        except Exception as e:
-            logging.error(f"Failed to cache text: {e}")
-
         return documents
 
     except Exception as e:
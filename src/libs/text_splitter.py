@@ -0,0 +1,184 @@
+import logging
+import re
+from collections import deque
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Optional: pip install semantic-text-splitter to chunk with the Rust splitter
+try:
+    from semantic_text_splitter import TextSplitter as RustTextSplitter
+except ImportError:
+    RustTextSplitter = None
+
+logging.basicConfig(level=logging.INFO)
+
+# Which splitter create_text_splitter builds; part of every loader cache key
+SPLITTER_NAME = "semantic-text-splitter" if RustTextSplitter is not None else "batched-recursive-character"
+logging.info(f"Splitting text with {SPLITTER_NAME}")
+
+def batched_len(texts):
+    return [len(text) for text in texts]
+
+def split_text_with_regex(text, separator, keep_separator):
+    """
+    Split on a regex separator, optionally keeping it at the start or end of
+    each piece. Copied from langchain_text_splitters.character, where it is
+    private and may change without notice.
+    """
+    if not separator:
+        splits = list(text)
+    elif keep_separator:
+        # The parentheses in the pattern keep the delimiters in the result
+        _splits = re.split(f"({separator})", text)
+        if keep_separator == "end":
+            splits = [_splits[i] + _splits[i + 1] for i in range(0, len(_splits) - 1, 2)]
+        else:
+            splits = [_splits[i] + _splits[i + 1] for i in range(1, len(_splits), 2)]
+        if len(_splits) % 2 == 0:
+            splits += _splits[-1:]
+        splits = splits + [_splits[-1]] if keep_separator == "end" else [_splits[0]] + splits
+    else:
+        splits = re.split(separator, text)
+    return [s for s in splits if s != ""]
+
+class BatchedRecursiveCharacterTextSplitter(RecursiveCharacterTextSplitter):
+    """
+    RecursiveCharacterTextSplitter that measures each level's splits in a single
+    batched call and carries those lengths through the merge step, so no split
+    is measured more than once.
+    """
+
+    def __init__(self, batch_length_function=batched_len, **kwargs):
+        super().__init__(**kwargs)
+        self._batch_length_function = batch_length_function
+
+    def _split_text(self, text, separators):
+        final_chunks = []
+
+        # Use the first separator that appears in the text
+        separator = separators[-1]
+        new_separators = []
+        for i, _s in enumerate(separators):
+            _separator = _s if self._is_separator_regex else re.escape(_s)
+            if _s == "":
+                separator = _s
+                break
+            if re.search(_separator, text):
+                separator = _s
+                new_separators = separators[i + 1:]
+                break
+
+        _separator = separator if self._is_separator_regex else re.escape(separator)
+        splits = split_text_with_regex(text, _separator, self._keep_separator)
+        lengths = self._batch_length_function(splits)
+
+        good_splits, good_lengths = [], []
+        _separator = "" if self._keep_separator else separator
+        for split, length in zip(splits, lengths):
+            if length < self._chunk_size:
+                good_splits.append(split)
+                good_lengths.append(length)
+                continue
+
+            if good_splits:
+                final_chunks.extend(self._merge_measured_splits(good_splits, good_lengths, _separator))
+                good_splits, good_lengths = [], []
+            if not new_separators:
+                final_chunks.append(split)
+            else:
+                final_chunks.extend(self._split_text(split, new_separators))
+
+        if good_splits:
+            final_chunks.extend(self._merge_measured_splits(good_splits, good_lengths, _separator))
+        return final_chunks
+
+    def _merge_measured_splits(self, splits, lengths, separator):
+        """Same algorithm as TextSplitter._merge_splits, using precomputed lengths."""
+        separator_len = self._batch_length_function([separator])[0]
+
+        docs = []
+        current_doc = deque()
+        total = 0
+        for split, length in zip(splits, lengths):
+            if total + length + (separator_len if current_doc else 0) > self._chunk_size:
+                if total > self._chunk_size:
+                    logging.warning(f"Created a chunk of size {total}, which is longer than the specified {self._chunk_size}")
+                if current_doc:
+                    doc = self._join_docs([s for s, _ in current_doc], separator)
+                    if doc is not None:
+                        docs.append(doc)
+                    # Slide the window until it fits the overlap budget
+                    while total > self._chunk_overlap or (
+                        total + length + (separator_len if current_doc else 0) > self._chunk_size and total > 0
+                    ):
+                        _, head_length = current_doc.popleft()
+                        total -= head_length + (separator_len if current_doc else 0)
+            current_doc.append((split, length))
+            total += length + (separator_len if len(current_doc) > 1 else 0)
+
+        doc = self._join_docs([s for s, _ in current_doc], separator)
+        if doc is not None:
+            docs.append(doc)
+        return docs
+
+class SemanticTextSplitter:
+    """
+    Thin adapter exposing the Rust semantic-text-splitter through the same
+    split_text interface as the LangChain splitters.
+    """
+
+    def __init__(self, chunk_size=1000, chunk_overlap=200):
+        # Aim for chunks between 80% and 100% of chunk_size
+        self._splitter = RustTextSplitter((int(chunk_size * 0.8), chunk_size), overlap=chunk_overlap)
+
+    def split_text(self, text):
+        return list(self._splitter.chunks(text))
+
+def create_text_splitter(chunk_size=1000, chunk_overlap=200):
+    """
+    Build the text splitter shared by all loaders.
+
+    Args:
+        chunk_size (int): Max characters per chunk.
+        chunk_overlap (int): Overlap between chunks.
+
+    Returns:
+        An object exposing split_text(text) -> list of strings.
+    """
+    if RustTextSplitter is not None:
+        return SemanticTextSplitter(chunk_size, chunk_overlap)
+    return BatchedRecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def split_stream(text_splitter, pieces, chunk_size, separator="\n"):
+    """
+    Split text that arrives in pieces without ever holding all of it in memory.
+
+    Pieces are buffered until the buffer exceeds 4x chunk_size; it is then split
+    and every chunk but the last is emitted. The raw text of the last chunk is
+    carried over so nothing spanning a piece boundary is cut.
+
+    Args:
+        text_splitter: Splitter exposing split_text.
+        pieces (iterable): Text pieces in order (pages, decoded blocks, ...).
+        chunk_size (int): The splitter's chunk size.
+        separator (str): Inserted between consecutive pieces.
+
+    Returns:
+        list: Chunks of the full text.
+    """
+    chunks = []
+    buffer = ""
+    for piece in pieces:
+        buffer = f"{buffer}{separator}{piece}" if buffer else piece
+        if len(buffer) > 4 * chunk_size:
+            split = text_splitter.split_text(buffer)
+            if not split:
+                buffer = ""
+                continue
+            tail = split.pop()
+            start = buffer.rfind(tail)
+            buffer = buffer[start:] if start != -1 else tail
+            chunks.extend(split)
+    if buffer:
+        chunks.extend(text_splitter.split_text(buffer))
+    return chunks
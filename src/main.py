@@ -3,11 +3,17 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl, Field
 from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+import asyncio
+import multiprocessing
 import uuid
 import time
 import os
 import pickle
 import redis
+import aiohttp
 from dotenv import load_dotenv
 
 from langchain.memory import ConversationBufferMemory
@@ -19,7 +25,8 @@ from libs.load_an_process_pdf import load_and_process_pdf
 from libs.load_and_process_csv import load_and_process_csv
 from libs.load_and_process_txt import load_and_process_txt
 from libs.load_and_process_json import load_and_process_json
-from config.db import create_vectordb
+from libs.http import run_loader
+from config.db import create_vectordb, ensure_vector_index
 from static.resources import create_chains
 from config.db import load_vectordb
 
@@ -43,6 +50,14 @@ except redis.ConnectionError as e:
     print(f"Failed to connect to Redis: {e}")
     logger.error(f"Failed to connect to Redis: {e}")
 
+# Worker processes for document loading and chunking
+def create_ingest_pool():
+    # Spawned, not forked: by the first /create-bot the server already runs threads
+    # (sync endpoints use a threadpool), and a forked child can inherit a held lock
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+ingest_pool = create_ingest_pool()
+
 # FastAPI app
 app = FastAPI()
 
@@ -55,6 +70,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await ensure_vector_index()
+    except Exception as e:
+        logger.error(f"Failed to create Neo4j indexes: {e}")
+
+@app.on_event("shutdown")
+def shutdown_ingest_pool():
+    # Lets workers exit normally so their finalizers quit any cached Chrome
+    ingest_pool.shutdown(wait=True, cancel_futures=True)
+
 # Pydantic models
 class CreateBotRequest(BaseModel):
     user_id: str = Field(..., min_length=1)
@@ -81,28 +108,40 @@ class QueryRequest(BaseModel):
 
 # POST /create-bot
 @app.post("/create-bot")
-def create_bot(request: CreateBotRequest):
+async def create_bot(request: CreateBotRequest):
+    global ingest_pool
     user_id, bot_id, kb_id = request.user_id, request.bot_id, request.kb_id
-    documents = []
+    pool = ingest_pool
 
     try:
-        # Load and process web URLs
-        if request.web_url:
-            for url in request.web_url:
-                documents.extend(load_and_process_documents(str(url), refresh=True))
-
-        # Load and process files
-        loaders = [load_and_process_pdf, load_and_process_csv, load_and_process_txt, load_and_process_json]
-        for file_list, loader in zip([request.pdf, request.csv, request.txt, request.json], loaders):
-            if file_list:
-                for path in file_list:
-                    documents.extend(loader(path, refresh=True))
+        # Every source is independent and CPU-bound, so fan them out across processes;
+        # remote files are downloaded concurrently over one shared session first
+        loop = asyncio.get_running_loop()
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=32)) as session:
+            tasks = [
+                loop.run_in_executor(pool, partial(load_and_process_documents, str(url), refresh=True))
+                for url in request.web_url or []
+            ]
+            tasks += [
+                loop.run_in_executor(pool, partial(load_and_process_txt, path, refresh=True))
+                for path in request.txt or []
+            ]
+            loaders = [load_and_process_pdf, load_and_process_csv, load_and_process_json]
+            for file_list, loader in zip([request.pdf, request.csv, request.json], loaders):
+                tasks += [run_loader(loader, path, session, pool, refresh=True) for path in file_list or []]
+
+            results = await asyncio.gather(*tasks)
+        documents = [doc for result in results for doc in result]
 
         if not documents:
             raise HTTPException(status_code=400, detail="No valid documents provided")
 
+        # Parallel lists from here on; the vector store never needs Document objects
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+
         # Create vector DB and save it
-        create_vectordb(documents, kb_id)
+        await create_vectordb(texts, metadatas, kb_id)
         print("Here fine")
         redis_client.set(f"last_refresh:{user_id}:{bot_id}:{kb_id}", str(time.time()))
         print("Here fine 2")
@@ -110,10 +149,29 @@ def create_bot(request: CreateBotRequest):
         if request.prompt_template:
             redis_client.set(f"prompt_template:{user_id}:{bot_id}", request.prompt_template)
 
+        get_retrieval_chain.cache_clear()
+
         return {"status": "success", "last_refresh": time.time()}
+    except BrokenProcessPool as e:
+        # A worker died (e.g. OOM-killed Chrome); replace the pool so later requests work
+        if ingest_pool is pool:
+            ingest_pool = create_ingest_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+        logger.error(f"Ingest worker crashed: {e}")
+        raise HTTPException(status_code=503, detail="A document worker crashed, please retry")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@lru_cache(maxsize=256)
+def get_retrieval_chain(prompt_template, kb_id):
+    """Build the retrieval chain for a prompt/knowledge base pair once and reuse it."""
+    retriever = load_vectordb().as_retriever(search_kwargs={
+        "filter": {
+            "source_url": kb_id  # or your specific URL/id
+        }
+    })
+    return create_retrieval_chain(retriever, create_chains(prompt_template))
+
 # POST /query
 @app.post("/query")
 def query_bot(request: QueryRequest):
@@ -122,8 +180,6 @@ def query_bot(request: QueryRequest):
     )
 
     try:
-        db = load_vectordb()
-
         memory_key = f"memory:{user_id}:{bot_id}:{kb_id}:{session_id}"
         memory_data = redis_client.get(memory_key)
         memory = pickle.loads(memory_data) if memory_data else ConversationBufferMemory(return_messages=True)
@@ -135,15 +191,8 @@ def query_bot(request: QueryRequest):
         if prompt_template:
             prompt_template = prompt_template.decode("utf-8")
 
-        # Create and run retrieval chain
-        base_chain = create_chains(prompt_template)
-        retriever = db.as_retriever(search_kwargs={
-            "filter": {
-                "source_url": kb_id  # or your specific URL/id
-            }
-        })
-
-        retrieval_chain = create_retrieval_chain(retriever, base_chain)
+        # Run the (cached) retrieval chain
+        retrieval_chain = get_retrieval_chain(prompt_template, kb_id)
         response = retrieval_chain.invoke({
             "input": input_text,
             "chat_history": memory.chat_memory.messages[:-1]
@@ -152,7 +201,7 @@ def query_bot(request: QueryRequest):
         memory.chat_memory.add_ai_message(response["answer"])
 
         # Store updated memory
-        redis_client.set(memory_key, pickle.dumps(memory))
+        redis_client.set(memory_key, pickle.dumps(memory, protocol=pickle.HIGHEST_PROTOCOL))
 
         return {
             "status": "success",
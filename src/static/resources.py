@@ -1,13 +1,15 @@
-import streamlit as st
+import functools
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains.combine_documents import create_stuff_documents_chain
 
-@st.cache_resource
+@functools.lru_cache(maxsize=1)
 def get_llm():
     return ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.1)
 
-@st.cache_resource
+# Prompts are user-supplied per bot, so keep only the most recent ones
+@functools.lru_cache(maxsize=256)
 def build_prompt(system_prompt_str: str):
     """Construct a ChatPromptTemplate from a system prompt string"""
     return ChatPromptTemplate.from_messages([
@@ -23,7 +25,7 @@ def build_prompt(system_prompt_str: str):
     ])
 
 
-@st.cache_resource
+@functools.lru_cache(maxsize=256)
 def create_chains(system_prompt_str: str):
     """Create the document chain using a system prompt string"""
     prompt_template = build_prompt(system_prompt_str)
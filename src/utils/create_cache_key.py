@@ -1,21 +1,90 @@
-import hashlib
-import json
+import threading
+import weakref
+import xxhash
+from collections import OrderedDict
+from operator import attrgetter
+
+# tuple of id(doc) -> (digest, finalizers); each finalizer drops the entry as soon
+# as one of its documents is freed, before that id can be reused
+_KEY_CACHE = OrderedDict()
+_MAX_KEY_CACHE = 256
+# Guards lookup/insert/evict; finalizers pop without it, which is atomic on its own
+_KEY_CACHE_LOCK = threading.Lock()
+
+_content_and_metadata = attrgetter('page_content', 'metadata')
+
+
+def _hash_documents(documents):
+    parts = []
+    for doc in documents:
+        page_content, metadata = _content_and_metadata(doc)
+        # First 100 chars and source, each length-prefixed so fields can't run together
+        page_content = page_content[:100].encode('utf-8', 'replace')
+        source = (metadata.get('source', '') if metadata else '').encode('utf-8', 'replace')
+        parts += (len(page_content).to_bytes(4, 'little'), page_content, len(source).to_bytes(4, 'little'), source)
+
+    # One join and one hash call instead of four updates per document
+    return xxhash.xxh3_128(b''.join(parts)).hexdigest()
 
 
 def create_cache_key(documents):
     """
     Create a unique, hashable key for caching based on document content
+
+    Results are memoized by document identity, so documents must not be
+    mutated in place after being hashed.
+    """
+    documents = tuple(documents)
+    identity = tuple(map(id, documents))
+
+    with _KEY_CACHE_LOCK:
+        cached = _KEY_CACHE.get(identity)
+        if cached is not None:
+            _KEY_CACHE.move_to_end(identity)
+            return cached[0]
+
+    digest = _hash_documents(documents)
+
+    finalizers = []
+    try:
+        for doc in documents:
+            finalizers.append(weakref.finalize(doc, _KEY_CACHE.pop, identity, None))
+    except TypeError:
+        # Not weak-referenceable, so the ids can't be trusted later; don't memoize
+        for finalizer in finalizers:
+            finalizer.detach()
+        return digest
+
+    with _KEY_CACHE_LOCK:
+        if identity in _KEY_CACHE:
+            # Another thread cached the same documents first
+            evicted = finalizers
+        else:
+            _KEY_CACHE[identity] = (digest, finalizers)
+            evicted = ()
+            if len(_KEY_CACHE) > _MAX_KEY_CACHE:
+                _, (_, evicted) = _KEY_CACHE.popitem(last=False)
+    for finalizer in evicted:
+        finalizer.detach()
+    return digest
+
+
+def create_tiered_cache_key(documents):
     """
-    # Extract unique identifiable information from documents
-    doc_summary = [
-        {
-            'page_content': doc.page_content[:100],  # First 100 chars
-            'source': doc.metadata.get('source', '')
-        } for doc in documents
-    ]
-    
-    # Convert to a JSON string
-    summary_json = json.dumps(doc_summary, sort_keys=True)
-    
-    # Create a hash
-    return hashlib.md5(summary_json.encode()).hexdigest()
\ No newline at end of file
+    Create a (coarse_key, fine_key) pair for two-tier caching
+
+    fine_key is create_cache_key(documents). coarse_key only depends on the set
+    of sources, so it still matches when re-chunking shifts page_content; callers
+    should verify a coarse hit before reusing it.
+    """
+    documents = tuple(documents)
+
+    sources = {metadata.get('source', '') if metadata else '' for _, metadata in map(_content_and_metadata, documents)}
+
+    h = xxhash.xxh3_128()
+    for source in sorted(sources):
+        source = source.encode('utf-8', 'replace')
+        h.update(len(source).to_bytes(4, 'little'))
+        h.update(source)
+
+    return h.hexdigest(), create_cache_key(documents)
@@ -0,0 +1,15 @@
+import hashlib
+
+try:
+    import blake3
+except ImportError:  # fall back to the BLAKE2 built into CPython
+    blake3 = None
+
+
+def fast_digest(data):
+    """
+    Return a 32-character hex digest of `data` for use in cache file names
+    """
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest(length=16)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
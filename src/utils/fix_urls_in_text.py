@@ -1,14 +1,17 @@
-import re
-
 def fix_urls_in_text(text, base_url):
     base_url = base_url.rstrip('/')
 
-    urls = re.findall(r'https?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text)
-   
-    for url in urls:
-        malformed_pattern = base_url + "https"
-        if malformed_pattern in url:
-            fixed_url = url.replace(malformed_pattern, base_url)
-            text = text.replace(url, fixed_url)
-   
-    return text
\ No newline at end of file
+    # Links that got the base URL glued in front of their scheme
+    marker = base_url + "https"
+    if marker not in text:
+        return text
+    return text.replace(marker, base_url)
+
+def fix_urls_in_text_bytes(text, base_url):
+    """Same as fix_urls_in_text for UTF-8 bytes, avoiding a decode/encode round trip."""
+    base_url = base_url.rstrip(b'/')
+
+    marker = base_url + b"https"
+    if marker not in text:
+        return text
+    return text.replace(marker, base_url)
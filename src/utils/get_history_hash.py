@@ -1,4 +1,74 @@
-import hashlib
+import threading
+import xxhash
+from collections import OrderedDict
 
-def get_history_hash(messages):
-    return hashlib.md5(str([(msg.type, msg.content) for msg in messages]).encode()).hexdigest()
\ No newline at end of file
+# caller key -> (hashed_count, fingerprint of the last hashed message, hasher)
+_HASH_STATES = OrderedDict()
+_MAX_HASH_STATES = 256
+_HASH_STATES_LOCK = threading.Lock()
+
+# Longer messages contribute only their head, tail and length to the hash
+_CONTENT_CAP = 4096
+_CONTENT_EDGE = 2048
+
+def _content_bytes(content):
+    # Multimodal and tool messages carry a list of parts rather than a str
+    if not isinstance(content, str):
+        content = repr(content)
+    # Cap before encoding so a huge pasted document costs O(1) to hash
+    if len(content) <= _CONTENT_CAP:
+        return content.encode('utf-8')
+    return (
+        content[:_CONTENT_EDGE].encode('utf-8')
+        + len(content).to_bytes(8, 'little')
+        + content[-_CONTENT_EDGE:].encode('utf-8')
+    )
+
+def _fingerprint(msg):
+    return xxhash.xxh3_64_intdigest(msg.type.encode('utf-8') + b'\0' + _content_bytes(msg.content))
+
+def _update(h, messages):
+    for msg in messages:
+        # Length-prefixed so (type, content) boundaries stay unambiguous
+        msg_type = msg.type.encode('utf-8')
+        content = _content_bytes(msg.content)
+        h.update(len(msg_type).to_bytes(2, 'little'))
+        h.update(msg_type)
+        h.update(len(content).to_bytes(4, 'little'))
+        h.update(content)
+
+def get_history_hash(messages, key=None):
+    """
+    Hash a chat history. With a stable `key` (e.g. the session's Redis key),
+    only messages appended since the last call for that key are fed to the
+    hasher (histories are assumed to be append-only).
+    """
+    state = None
+    if key is not None:
+        with _HASH_STATES_LOCK:
+            state = _HASH_STATES.get(key)
+            if state is not None:
+                _HASH_STATES.move_to_end(key)
+
+    # Stored hashers are never updated in place, so copying one needs no lock
+    if (
+        state is not None
+        and 0 < state[0] <= len(messages)
+        and _fingerprint(messages[state[0] - 1]) == state[1]
+    ):
+        count, _, cached = state
+        h = cached.copy()
+    else:
+        count = 0
+        h = xxhash.xxh3_128()
+
+    _update(h, messages[count:])
+
+    if key is not None and messages:
+        state = (len(messages), _fingerprint(messages[-1]), h.copy())
+        with _HASH_STATES_LOCK:
+            _HASH_STATES[key] = state
+            _HASH_STATES.move_to_end(key)
+            if len(_HASH_STATES) > _MAX_HASH_STATES:
+                _HASH_STATES.popitem(last=False)
+    return h.hexdigest()
@@ -1,5 +1,10 @@
-from urllib.parse import urlparse
+from functools import lru_cache
 
+@lru_cache(maxsize=1024)
 def get_origin(url):
-    parsed = urlparse(url)
-    return f"{parsed.scheme}://{parsed.netloc}"
\ No newline at end of file
+    # Only scheme and netloc are needed, so skip urlparse's full split
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return ""
+    netloc = rest.partition("/")[0].partition("?")[0].partition("#")[0]
+    return scheme.lower() + "://" + netloc
@@ -0,0 +1,19 @@
+import orjson
+import zstandard
+from langchain.schema import Document
+
+
+def serialize_docs(docs):
+    """
+    Encode a list of Documents as zstd-compressed JSON for the on-disk cache
+    """
+    payload = orjson.dumps([{"c": doc.page_content, "m": doc.metadata} for doc in docs])
+    return zstandard.ZstdCompressor(level=3).compress(payload)
+
+
+def deserialize_docs(data):
+    """
+    Rebuild the Document list written by serialize_docs
+    """
+    rows = orjson.loads(zstandard.ZstdDecompressor().decompress(data))
+    return [Document(page_content=row["c"], metadata=row["m"]) for row in rows]